@@ -1,5 +1,6 @@
 from flask import Flask, request, jsonify
 import os
+import re
 from dotenv import load_dotenv
 from summarisation_service import get_summarization_service
 from extraction_service import ExtractionService
@@ -14,6 +15,11 @@ app = Flask(__name__)
 # Initialize services
 summarization_service = get_summarization_service()
 
+# Matches a trailing "|score|" on one idea; the extractor joins items
+# with ":::", so the separator split happens first and colons inside the
+# idea text survive intact
+_SCORE_RE = re.compile(r"(.*?)\s*\|(\d+)\|\s*$")
+
 @app.route('/api/summarize', methods=['POST'])
 def summarize():
     """API endpoint for summarizing text
@@ -53,16 +59,14 @@ def extract_ideas():
         text = data['text']
         result = atomic_idea_extractor.extract(text)
         
-        # Parse the results into a more structured format
-        ideas = []
+        # Parse the results into a more structured format: split on the
+        # ":::" separator, then pull the trailing score off each item
         if isinstance(result, str):
+            ideas = []
             for item in result.split(':::'):
-                if '|' in item:
-                    text, score_part = item.rsplit('|', 2)
-                    score = int(score_part.strip('|'))
-                    ideas.append({"text": text.strip(), "score": score})
-                else:
-                    ideas.append({"text": item.strip(), "score": 0})
+                match = _SCORE_RE.match(item.strip())
+                if match:
+                    ideas.append({"text": match.group(1).strip(), "score": int(match.group(2))})
         else:
             # If already structured
             ideas = result
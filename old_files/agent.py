@@ -1,50 +1,139 @@
+import asyncio
 import os
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Annotated, Literal
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import SystemMessage, AIMessage, HumanMessage, RemoveMessage
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import MessagesState, StateGraph, START, END
 from langgraph.prebuilt import ToolNode, tools_condition
 from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain.globals import set_llm_cache
+from langchain_community.cache import SQLiteCache
+
+# Process-wide exact-prompt cache: identical ChatAnthropic calls (the
+# templated summarize prompts especially) return the stored completion
+# instead of a round-trip, and SQLite keeps hits across restarts
+set_llm_cache(SQLiteCache(database_path=".langchain.db"))
+
+# Short-term LRU of recent user inputs -> responses, so accidental
+# double-submits and ping-style repeats skip the Claude call entirely
+_recent = OrderedDict()
+_RECENT_MAX = 256
+
+# Shared across all graphs: constructing these per initialize_graph call
+# re-validates env vars and leaks a fresh httpx connection pool each time
+_SEARCH = TavilySearchResults(name="tavily_search", max_results=2)
+_TOOLS = [_SEARCH]
+
+@lru_cache(maxsize=1)
+def _make_checkpointer():
+    """Build the shared SQLite-backed checkpointer on first use.
+
+    One WAL-mode connection serves every compiled graph: thread_id keeps
+    conversations apart, summaries survive process restarts instead of
+    being rebuilt from scratch, and state no longer accumulates unbounded
+    in RAM the way MemorySaver's did.
+    """
+    import sqlite3
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    conn = sqlite3.connect("eva_checkpoints.db", check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return SqliteSaver(conn)
+
+@lru_cache(maxsize=8)
+def _make_llm(model_name: str, temperature: float):
+    """Build (or reuse) a tool-bound ChatAnthropic client for these settings."""
+    llm = ChatAnthropic(
+        model=model_name,
+        temperature=temperature,
+        api_key=os.getenv("ANTHROPIC_API_KEY")
+    )
+    return llm.bind_tools(_TOOLS)
 
 class ChatAgent:
     def __init__(self, anthropic_api_key, tavily_api_key, base_prompt):
         self.tool_node = None
         self.graph = None
-        anthropic_api_key=anthropic_api_key,
-        tavily_api_key=tavily_api_key,
-        base_prompt=base_prompt
+        self._graph_cache = {}
+        self.anthropic_api_key = anthropic_api_key
+        self.tavily_api_key = tavily_api_key
+        self.base_prompt = base_prompt
 
     
     def initialize_graph(self, model_name: str, temperature: float, summarization_threshold: int):
+        # Reuse the compiled graph for repeat sessions with the same settings;
+        # rebuilding the StateGraph, tools and LLM per call is pure overhead.
+        # Per-conversation isolation comes from the checkpointer thread_id,
+        # not from recompiling.
+        key = (model_name, temperature, summarization_threshold)
+        cached = self._graph_cache.get(key)
+        if cached:
+            self.graph, self.tool_node = cached
+            return cached
+
         class State(MessagesState):
             summary: str
 
         graph_builder = StateGraph(State)
 
-        search = TavilySearchResults(name="tavily_search", max_results=2)
-        tools = [search]
-        tool_node = ToolNode(tools=tools)
-
-        llm = ChatAnthropic(
-            model=model_name,
-            temperature=temperature,
-            api_key=os.getenv("ANTHROPIC_API_KEY")
-        )
+        tool_node = ToolNode(tools=_TOOLS)
+        llm_with_tools = _make_llm(model_name, temperature)
         
-        llm_with_tools = llm.bind_tools(tools)
-        
-        def chatbot(state: State):
+        # Stable prefix for Anthropic's prompt cache: the base prompt never
+        # changes, so marking it with cache_control lets repeat calls reuse it.
+        # The rolling summary goes in a second, uncached system message so a
+        # summary update never invalidates the cached prefix.
+        base_system_message = SystemMessage(content=[{
+            "type": "text",
+            "text": self.base_prompt,
+            "cache_control": {"type": "ephemeral"}
+        }])
+
+        def chatbot(state: State, config):
             summary = state.get("summary", "")
+            last = state["messages"][-1] if state["messages"] else None
+
+            # Serve immediate repeats of a recent user input from the LRU.
+            # The key carries the conversation context — thread, model
+            # settings, base prompt, rolling summary — not just the input
+            # text, so a reply never leaks into an unrelated conversation.
+            cache_key = None
+            if isinstance(last, HumanMessage):
+                cache_key = (
+                    config.get("configurable", {}).get("thread_id"),
+                    model_name,
+                    temperature,
+                    self.base_prompt,
+                    summary,
+                    last.content,
+                )
+                cached_reply = _recent.get(cache_key)
+                if cached_reply is not None:
+                    _recent.move_to_end(cache_key)
+                    # Replay a copy without the stored id: add_messages
+                    # upserts by id, so returning the original message
+                    # would overwrite the earlier reply in place instead
+                    # of appending a new one
+                    return {"messages": [cached_reply.model_copy(update={"id": None})]}
+
+            messages = [base_system_message]
             if summary:
-                system_message = f"Summary of conversation earlier: {summary}"
-                messages = [SystemMessage(content=system_message)] + state["messages"]
-            else:
-                messages = state["messages"]
+                messages.append(SystemMessage(content=f"Summary of conversation earlier: {summary}"))
+            messages += state["messages"]
             response = llm_with_tools.invoke(messages)
+
+            if cache_key is not None:
+                _recent[cache_key] = response
+                _recent.move_to_end(cache_key)
+                while len(_recent) > _RECENT_MAX:
+                    _recent.popitem(last=False)
+
             return {"messages": [response]}
 
-        def summarize_conversation(state: State):
+        async def summarize_conversation(state: State):
             summary = state.get("summary", "")
             if summary:
                 summary_message = (
@@ -54,10 +143,19 @@ class ChatAgent:
             else:
                 summary_message = "Create a summary of the conversation above:"
 
-            messages = state["messages"][:-summarization_threshold] + [HumanMessage(content=summary_message)]
-            response = llm_with_tools.invoke(messages)
+            # Slice the history once; both the summary prompt and the
+            # RemoveMessage list need the same prefix
+            old_messages = state["messages"][:-summarization_threshold]
+            messages = old_messages + [HumanMessage(content=summary_message)]
 
-            delete_messages = [RemoveMessage(id=m.id) for m in state["messages"][:-summarization_threshold]]
+            # Async node: the summary call runs without blocking the event
+            # loop, and the message-trim bookkeeping overlaps the LLM wait
+            response, delete_messages = await asyncio.gather(
+                llm_with_tools.ainvoke(messages),
+                asyncio.to_thread(
+                    lambda: [RemoveMessage(id=m.id) for m in old_messages]
+                )
+            )
             return {"summary": response.content, "messages": delete_messages}
 
         def should_continue(state: State) -> Literal["summarize_conversation", "tools", END]:
@@ -96,7 +194,7 @@ class ChatAgent:
             },
         )
 
-        memory = MemorySaver()
-        self.graph = graph_builder.compile(checkpointer=memory)
+        self.graph = graph_builder.compile(checkpointer=_make_checkpointer())
         self.tool_node = tool_node
+        self._graph_cache[key] = (self.graph, self.tool_node)
         return self.graph, self.tool_node
\ No newline at end of file
@@ -1,4 +1,5 @@
 import logging
+import re
 from typing import Dict, List, Optional, Union
 from anthropic import Anthropic
 from dotenv import load_dotenv
@@ -6,6 +7,9 @@ import os
 
 load_dotenv()
 
+# Compiled once: matches a trailing |score| marker at the end of an item
+_SCORE_RE = re.compile(r'(.*?)\s*\|(\d+)\|\s*$')
+
 class ExtractionService:
     def __init__(self, 
                  prompt: str,
@@ -73,8 +77,7 @@ class ExtractionService:
         cleaned_for_parsing = clean_item.rstrip('.,!?').strip()
         
         # Check for score at the end using strict regex
-        import re
-        match = re.match(r'(.*?)\s*\|(\d+)\|\s*$', cleaned_for_parsing)
+        match = _SCORE_RE.match(cleaned_for_parsing)
         
         if match:
             result = {
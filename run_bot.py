@@ -1,24 +1,59 @@
+import asyncio
+import aiohttp
 import discord
+from collections import deque
 import datetime
+import logging
+import os
 import time
 import sys
 from credentials import DISCORD_BOT_TOKEN
-from utils import get_transcripts_from_audio_data, answer_prompts, summarize_message, check_api_health
+# Lazy %s formatting means the big structures below (transcripts, user
+# lists) are only rendered when DEBUG is actually enabled
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+log = logging.getLogger("eva.bot")
+
+from utils import API_BASE_URL, SUMMARY_ERROR_TITLE, get_transcripts_from_audio_data, answer_prompts, summarize_message, stream_summary_to_message, transcribe_pcm
+
+async def _wait_for_api(deadline=60.0):
+    """Wait for the API to come up, polling with exponential backoff.
+
+    Probes start at 100ms and double up to a 5s cap, so a warm API is
+    detected almost immediately while a cold one isn't hammered. A single
+    overall deadline replaces the old fixed retry count, so transient
+    startup slowness doesn't hard-exit the bot.
+
+    Args:
+        deadline (float, optional): Max seconds to wait. Defaults to 60.0.
+
+    Returns:
+        bool: True once the API answers, False if the deadline passes
+    """
+    start = time.monotonic()
+    attempt = 0
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() - start < deadline:
+            try:
+                async with session.head(
+                    f"{API_BASE_URL}/health",
+                    timeout=aiohttp.ClientTimeout(total=1)
+                ) as response:
+                    if response.status == 200:
+                        return True
+            except aiohttp.ClientError:
+                pass
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.sleep(min(5, 0.1 * 2 ** attempt))
+            attempt += 1
+    return False
 
 # Check API health before starting
 print("Checking API health...")
-max_retries = 5
-retry_count = 0
-api_ready = False
-
-while retry_count < max_retries and not api_ready:
-    if check_api_health():
-        api_ready = True
-        print("API is healthy and ready!")
-    else:
-        retry_count += 1
-        print(f"API not ready, retrying in 5 seconds... (Attempt {retry_count}/{max_retries})")
-        time.sleep(5)
+api_ready = asyncio.run(_wait_for_api())
+
+if api_ready:
+    print("API is healthy and ready!")
 
 if not api_ready:
     print("ERROR: API is not available. Please make sure the API is running.")
@@ -28,21 +63,130 @@ if not api_ready:
 # Init bot
 bot = discord.Bot(intents=discord.Intents.all())  # We need message content and reaction intents
 connections = {}
+_user_is_bot_cache = {}  # user_id -> is_bot; bot-ness never changes, so cache it
+channel_summaries = {}  # channel_id -> (last summarized message id, summary result)
+# Summaries quote user content: never re-ping people mentioned in it, and
+# skipping server-side URL unfurling shrinks every chunk send
+NO_MENTIONS = discord.AllowedMentions.none()
+
+async def _is_bot(user_id):
+    """Whether a user is a bot, preferring the free gateway cache.
+
+    Args:
+        user_id (int): Discord user id
+
+    Returns:
+        bool: True if the user is a bot
+    """
+    user = bot.get_user(user_id) or await bot.fetch_user(user_id)
+    return user.bot
+
+class StreamingSink(discord.sinks.Sink):
+    """Sink that transcribes audio in slices while recording is live.
+
+    Waiting for Stop means the full Whisper runtime lands after the button
+    press. This sink buffers each user's raw PCM and a background task wakes
+    every slice_seconds, transcribing whatever arrived since the last slice,
+    so by the time recording stops only the final slice is left to process.
+    Segment timestamps are shifted by how much audio was already transcribed,
+    keeping the conversation timeline intact.
+
+    Unlike WaveSink it never retains the whole decoded recording: slices
+    are transcribed and dropped, capping memory at one slice per user
+    instead of ~11MB per minute per speaker.
+    """
+
+    def __init__(self, slice_seconds=20):
+        super().__init__()
+        self.slice_seconds = slice_seconds
+        self.partials = {}   # user_id -> accumulated segment dicts
+        self._buffers = {}   # user_id -> bytearray of PCM since last slice
+        self._offsets = {}   # user_id -> seconds already transcribed
+        self._task = asyncio.get_event_loop().create_task(self._worker())
+
+    def write(self, data, user):
+        # Track the speaker for once_done's bot filter, but keep only the
+        # current slice's PCM
+        if user not in self.audio_data:
+            self.audio_data[user] = None
+        self._buffers.setdefault(user, bytearray()).extend(data)
+
+    async def _worker(self):
+        try:
+            while True:
+                await asyncio.sleep(self.slice_seconds)
+                await self.flush()
+        except asyncio.CancelledError:
+            pass
+
+    async def flush(self):
+        """Transcribe everything buffered since the last slice."""
+        for user_id, buf in list(self._buffers.items()):
+            if not buf:
+                continue
+            pcm_bytes = bytes(buf)
+            buf.clear()
+            offset = self._offsets.get(user_id, 0.0)
+            # 48kHz stereo int16: 4 bytes per sample frame
+            self._offsets[user_id] = offset + len(pcm_bytes) / (48000 * 2 * 2)
+            segments = await asyncio.to_thread(transcribe_pcm, pcm_bytes, offset)
+            self.partials.setdefault(user_id, []).extend(segments)
+
+    def cleanup(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        # No per-user files to finalize; just mark the recording finished
+        self.finished = True
+
+def _chunk(text, limit=1900):
+    """Split text into pieces of at most limit characters in one pass.
+
+    Breaks on the last newline (then space) before the limit so words,
+    emoji and markdown aren't cut mid-sequence, and copies each character
+    exactly once instead of re-slicing the full string per chunk.
+
+    Args:
+        text (str): Text to split
+        limit (int, optional): Max characters per piece. Defaults to 1900.
+
+    Returns:
+        list: The chunks, in order
+    """
+    chunks = []
+    start = 0
+    n = len(text)
+    while n - start > limit:
+        cut = text.rfind('\n', start, start + limit)
+        if cut <= start:
+            cut = text.rfind(' ', start, start + limit)
+        if cut <= start:
+            cut = start + limit
+        chunks.append(text[start:cut])
+        start = cut
+    if start < n:
+        chunks.append(text[start:])
+    return chunks
 
 class MyView(discord.ui.View): # Create a class called MyView that subclasses discord.ui.View
     """a class that subclasses discord.ui.View that will display buttons to control the bot
     """
     def __init__(self, ctx, vc):
+        # No timeout: view timeouts count from the last interaction, so a
+        # finite value would expire the Stop button mid-recording on any
+        # session longer than the timeout. Abandoned views don't leak —
+        # on_voice_state_update stops and drops them when the bot leaves
+        # voice.
         super().__init__(timeout=None)
         self.ctx = ctx
         self.vc = vc
-        
+
     # Button that starts recording
     @discord.ui.button(label="Start", style=discord.ButtonStyle.primary, emoji="🔴")
     async def start(self, button, interaction):
-        await interaction.response.edit_message(content = "recording....")   
+        await interaction.response.edit_message(content = "recording....")
         self.vc.start_recording(
-            discord.sinks.WaveSink(),  # The sink type to use.
+            StreamingSink(),  # Transcribes in slices while recording runs.
             once_done,  # callback function after recording is finished.
             self.ctx.channel  # The channel to disconnect from.
         )
@@ -50,10 +194,13 @@ class MyView(discord.ui.View): # Create a class called MyView that subclasses di
     # Button that stops recording
     @discord.ui.button(label="Stop", style=discord.ButtonStyle.primary, emoji="⬜")
     async def stop(self, button, interaction):
-        if self.ctx.guild.id in connections:  # Check if the guild is in the cache.
-            self.vc = connections[self.ctx.guild.id]
+        entry = connections.get(self.ctx.guild.id)  # Check if the guild is in the cache.
+        if entry is not None:
+            self.vc = entry["vc"]
             self.vc.stop_recording()  # Stop recording, and call the callback (once_done).
-            await interaction.response.edit_message(content = "You Can Start recording!",  view=MyView(self.ctx,self.vc))
+            # Reuse this view: its ctx/vc are still valid, so there's no
+            # reason to allocate and re-register a fresh one per press
+            await interaction.response.edit_message(content = "You Can Start recording!", view=self)
         else:
             await self.ctx.respond("I am currently not recording here.")  # Respond with this if we aren't recording.
 
@@ -64,38 +211,53 @@ async def once_done(sink: discord.sinks, channel: discord.TextChannel):
         sink (discord.sinks): Audio Sink
         channel (discord.TextChannel): Channel to send reponse in
     """
-    print("[DEBUG] Starting once_done callback")
+    log.debug("Starting once_done callback")
     msg = await channel.send("Creating response...")
     
-    # Filter bots out
-    for user_id in list(sink.audio_data.keys()):
-        user = await bot.fetch_user(user_id)
-        if user.bot:
-            del sink.audio_data[user_id]
+    # Filter bots out. The memoized flags and the gateway cache are free;
+    # only genuinely unknown users cost REST calls, and those run
+    # concurrently
+    unknown = [uid for uid in sink.audio_data if uid not in _user_is_bot_cache]
+    if unknown:
+        flags = await asyncio.gather(*(_is_bot(uid) for uid in unknown))
+        _user_is_bot_cache.update(zip(unknown, flags))
+    sink.audio_data = {
+        uid: audio for uid, audio in sink.audio_data.items()
+        if not _user_is_bot_cache[uid]
+    }
 
     recorded_users = [  # A list of recorded users
         f"<@{user_id}>"
         for user_id, _ in sink.audio_data.items()
     ]
 
-    print(f"[DEBUG] Recorded users: {recorded_users}")
+    log.debug("Recorded users: %s", recorded_users)
 
-    # Prepare files for transcription
-    input_audio_data = {
-        f"<@{user_id}>": audio.file
-        for user_id, audio in sink.audio_data.items()
-    }
+    if isinstance(sink, StreamingSink):
+        # Most audio was transcribed during recording; just drain the slice
+        # accumulated since the last flush
+        await sink.flush()
+        transcripts = {
+            f"<@{user_id}>": sink.partials.get(user_id, [])
+            for user_id in sink.audio_data
+        }
+    else:
+        # Prepare files for transcription
+        input_audio_data = {
+            f"<@{user_id}>": audio.file
+            for user_id, audio in sink.audio_data.items()
+        }
 
-    print("[DEBUG] Calling get_transcripts_from_audio_data")
-    transcripts = await get_transcripts_from_audio_data(input_audio_data)
-    print(f"[DEBUG] Received transcripts: {transcripts}")
+        log.debug("Calling get_transcripts_from_audio_data")
+        transcripts = await get_transcripts_from_audio_data(input_audio_data)
+        log.debug("Received transcripts: %s", transcripts)
     
     await msg.edit(f"finished recording prompts for: {', '.join(recorded_users)}.")  # Send a message to notify that recording finished.
     
     # Send prompt responses
-    print("[DEBUG] Calling answer_prompts")
+    log.debug("Calling answer_prompts")
     await answer_prompts(transcripts, channel) # Sends answers for users prompts
-    print("[DEBUG] Finished processing audio")
+    log.debug("Finished processing audio")
 
 @bot.command(description="Sends the bot's latency.") # this decorator makes a slash command
 async def ping(ctx): # a slash command will be created with the name "ping"
@@ -111,11 +273,36 @@ async def join(ctx: discord.context):
     # If the user calling the bot is not in voice channel
     if not ctx.author.voice:
         await ctx.respond("You aren't in a voice channel!")
-        
-    vc = await ctx.author.voice.channel.connect()  # Connect to the voice channel the author is in.
-    connections.update({ctx.guild.id: vc})  # Updating the cache with the guild and channel.
+        return
+
+    # Reuse the live voice client when possible: a reconnect to the same
+    # channel costs a full voice-gateway handshake and can leave a
+    # duplicate session behind
+    target = ctx.author.voice.channel
+    vc = ctx.guild.voice_client
+    if vc and vc.channel == target:
+        pass  # already connected where we need to be
+    elif vc:
+        await vc.move_to(target)
+    else:
+        # Self-deaf stops Discord sending mixed playback back to the bot
+        # (about half the inbound voice traffic); self-mute because the bot
+        # never speaks. Users' raw tracks still reach the recording sink.
+        vc = await target.connect(self_deaf=True, self_mute=True)  # Connect to the voice channel the author is in.
+
+    # Reuse the guild's control view when it's still live: constructing
+    # MyView re-registers both buttons and fresh component ids, and the
+    # cached one only needs its ctx/vc refreshed
+    entry = connections.get(ctx.guild.id)
+    view = entry["view"] if entry else None
+    if view is None or view.is_finished():
+        view = MyView(ctx, vc)
+    else:
+        view.ctx = ctx
+        view.vc = vc
+    connections[ctx.guild.id] = {"vc": vc, "view": view}  # Updating the cache with the guild and channel.
     # Send recording view
-    await ctx.respond("You Can Start recording!", view = MyView(ctx, vc))
+    await ctx.respond("You Can Start recording!", view=view)
 
 @bot.command(description="Leave")
 async def leave(ctx: discord.context):
@@ -124,14 +311,30 @@ async def leave(ctx: discord.context):
     Args:
         ctx (discord.context): Discord context
     """
-    if ctx.guild.id in connections:  # Check if the guild is in the cache.
-        vc = connections[ctx.guild.id]
-        await vc.disconnect()  # Disconnect from the voice channel.
-        del connections[ctx.guild.id]  # Remove the guild from the cache.
+    entry = connections.pop(ctx.guild.id, None)  # Check if the guild is in the cache.
+    if entry is not None:
+        await entry["vc"].disconnect()  # Disconnect from the voice channel.
+        entry["view"].stop()  # Release the control view's listeners.
         await ctx.delete()  # And delete.
     else:
         await ctx.respond("I am currently not Connected")  # Respond with this if we aren't recording.
 
+@bot.event
+async def on_voice_state_update(member, before, after):
+    """Keep the connections cache consistent with Discord's actual state
+
+    Args:
+        member (discord.Member): Member whose voice state changed
+        before (discord.VoiceState): Previous state
+        after (discord.VoiceState): New state
+    """
+    # If the bot is disconnected outside /leave (kick, channel delete,
+    # gateway drop), drop the stale entry so /join doesn't reuse it
+    if member.id == bot.user.id and after.channel is None:
+        entry = connections.pop(member.guild.id, None)
+        if entry is not None:
+            entry["view"].stop()
+
 @bot.command(description="Summarize recent messages")
 async def summarize(ctx, messages: discord.Option(int, "Number of messages to summarize", min_value=2, max_value=100, default=10)):
     """Summarize the specified number of recent messages in the channel
@@ -140,68 +343,148 @@ async def summarize(ctx, messages: discord.Option(int, "Number of messages to su
         ctx (discord.context): Discord context
         messages (int): Number of messages to summarize (default: 10)
     """
-    # Send a processing message
-    processing_msg = await ctx.respond(f"Summarizing the last {messages} messages, please wait...")
+    # Defer instead of posting a "please wait" message: Discord shows
+    # "thinking..." for free and we skip one HTTP round-trip
+    await ctx.defer()
     
     try:
-        # Fetch message history - slash commands don't appear in history, so no need to filter them out
-        message_history = []
-        message_count = 0
-        
-        async for message in ctx.channel.history(limit=100):  # Set higher limit to find enough non-bot messages
-            # Skip bot messages (optional, remove if you want to include bot messages)
-            if message.author.bot:
-                continue
-                
-            # Add to history with author name
-            message_history.append(f"{message.author.display_name}: {message.content}")
-            message_count += 1
-            
-            # Stop once we have enough messages
-            if message_count >= messages:
-                break
-        
-        # Reverse to get chronological order
-        message_history.reverse()
-        
-        # Skip if no messages found
-        if not message_history:
-            await processing_msg.edit(content="No valid messages found to summarize.")
-            return
-            
-        # Join all messages into a single text with line breaks
-        conversation_text = "\n".join(message_history)
-        
-        # Get the summary from the summarization service
-        result = summarize_message(conversation_text)
+        # Fetch message history - slash commands don't appear in history, so no need to filter them out.
+        # Size the fetch to the request instead of always pulling 100: some
+        # slack covers interleaved bot messages, and we stop early anyway.
+        fetch_limit = min(100, max(messages * 2, messages + 5))
+        names = {}  # author id -> display name; resolved once per author
+        newest_id = None
+
+        def _format(message):
+            # display_name walks the member cache, so resolve it once per
+            # unique author
+            author = message.author
+            name = names.get(author.id)
+            if name is None:
+                name = names[author.id] = author.display_name
+            return f"{name}: {message.content}"
+
+        prior = channel_summaries.get(ctx.channel.id)
+        if prior is not None:
+            # Rolling summary: fold only the messages that arrived since the
+            # last run into the previous summary, so cost scales with new
+            # traffic rather than the whole window
+            last_id, prev_result = prior
+            new_lines = []
+            async for message in ctx.channel.history(
+                limit=fetch_limit, after=discord.Object(id=last_id), oldest_first=True
+            ):
+                if message.author.bot:
+                    continue
+                new_lines.append(_format(message))
+                newest_id = message.id
+
+            if not new_lines:
+                # Nothing new since last time; serve the stored summary
+                result = prev_result
+                newest_id = last_id
+            else:
+                conversation_text = (
+                    "Summary of the conversation so far:\n"
+                    + prev_result['summary']
+                    + "\n---\nNew messages:\n"
+                    + "\n".join(new_lines)
+                )
+                result = await asyncio.to_thread(summarize_message, conversation_text)
+        else:
+            message_history = deque(maxlen=messages)
+            oldest_id = None
+
+            async for message in ctx.channel.history(limit=fetch_limit):
+                if newest_id is None:
+                    newest_id = message.id
+                oldest_id = message.id
+                # Skip bot messages (optional, remove if you want to include bot messages)
+                if message.author.bot:
+                    continue
+
+                message_history.append(_format(message))
+
+                # Stop once we have enough messages
+                if len(message_history) >= messages:
+                    break
+
+            # A bot-heavy channel can under-fill the window; page once more
+            # from where the first fetch stopped instead of defaulting every
+            # call to a 100-message pull
+            if len(message_history) < messages and oldest_id is not None:
+                async for message in ctx.channel.history(
+                    limit=fetch_limit, before=discord.Object(id=oldest_id)
+                ):
+                    if message.author.bot:
+                        continue
+                    message_history.append(_format(message))
+                    if len(message_history) >= messages:
+                        break
+
+            # Skip if no messages found
+            if not message_history:
+                await ctx.followup.send("No valid messages found to summarize.")
+                return
+
+            # History arrives newest-first; join in chronological order
+            conversation_text = "\n".join(reversed(message_history))
+
+            # Get the summary from the summarization service
+            # Off the event loop: the HTTP call can take seconds and would
+            # otherwise stall heartbeats and every other handler
+            result = await asyncio.to_thread(summarize_message, conversation_text)
+
+        # Only persist real summaries: caching the fallback dict would
+        # re-serve the error on no-new-message runs and fold "An error
+        # occurred..." into every later incremental prompt
+        if result.get('title') != SUMMARY_ERROR_TITLE:
+            channel_summaries[ctx.channel.id] = (newest_id, result)
         
         # Create a thread for the summary
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Compact UTC stamp: sort-friendly, unambiguous, and strftime on an
+        # aware datetime skips the naive-local conversion path
+        timestamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
         thread_name = f"Summary {timestamp}"
-        thread = await processing_msg.edit(content=f"**{result['title']}**", view=None)
-        thread = await thread.create_thread(name=thread_name)
+        summary_msg = await ctx.followup.send(f"**{result['title']}**")
+        thread = await summary_msg.create_thread(name=thread_name)
         
-        # Split the summary into chunks of 1900 characters (leaving room for formatting)
-        summary_chunks = [result['summary'][i:i+1900] for i in range(0, len(result['summary']), 1900)]
-        
-        # Send each chunk in the thread
-        for chunk in summary_chunks:
-            await thread.send(chunk)
+        # Split the summary into Discord-sized chunks on word boundaries
+        summary_chunks = _chunk(result['summary'])
+
+        # Part numbers keep the text readable if Discord renders a
+        # pipelined batch out of send order
+        total = len(summary_chunks)
+        if total > 1:
+            summary_chunks = [f"({n}/{total}) {c}" for n, c in enumerate(summary_chunks, 1)]
+
+        # Pipeline the sends: a serial await per chunk costs one RTT each.
+        # Groups of five respect Discord's 5 msgs/5s channel bucket.
+        for i in range(0, len(summary_chunks), 5):
+            await asyncio.gather(*(
+                thread.send(c, allowed_mentions=NO_MENTIONS, suppress=True)
+                for c in summary_chunks[i:i + 5]
+            ))
             
     except Exception as e:
-        import traceback
-        print(f"Error in summarize command: {e}")
-        print(traceback.format_exc())
-        await processing_msg.edit(content=f"Sorry, I couldn't summarize those messages. Error: {str(e)}")
+        log.error("Error in summarize command: %s", e, exc_info=True)
+        await ctx.followup.send(f"Sorry, I couldn't summarize those messages. Error: {str(e)}")
 
 #login event
 @bot.event
 async def on_ready():
     """Prints message to console once we successfully load the bot
     """
-    print('We have logged in as {0.user}'.format(bot) + ' ' + datetime.datetime.utcnow().strftime("%m/%d/%Y %H:%M:%S UTC"))
+    # utcnow() is deprecated in 3.12; an aware now() formats the same and
+    # keeps the timestamp explicit about its zone
+    print('We have logged in as {0.user}'.format(bot) + ' ' + datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'))
     
-    # Sync commands with Discord
+    # Sync commands with Discord. The sync round-trip costs 1-5s against
+    # Discord even when nothing changed, so frequent restarts during
+    # development can skip it with SYNC_COMMANDS=0.
+    if os.getenv("SYNC_COMMANDS", "1") == "0":
+        print("Skipping command sync (SYNC_COMMANDS=0)")
+        return
     print("Syncing commands with Discord...")
     try:
         synced = await bot.sync_commands()
@@ -219,32 +502,36 @@ async def on_reaction_add(reaction, user):
     # If the reaction is the robot emoji
     if str(reaction.emoji) == "🤖":
         message = reaction.message
-        # Send a processing message
+        # This message becomes the summary: the stream edits it in place
         processing_msg = await message.channel.send("Summarizing message, please wait...")
-        
+
         try:
-            # Get the summary from the summarization service via API
-            result = summarize_message(message.content)
-            
-            # Send the title first
-            await message.reply(f"**{result['title']}**")
-            
-            # Split the summary into chunks of 1900 characters (leaving room for formatting)
-            summary_chunks = [result['summary'][i:i+1900] for i in range(0, len(result['summary']), 1900)]
-            
-            # Send each chunk as a separate message
-            for i, chunk in enumerate(summary_chunks):
-                if i == 0:
-                    # First chunk as a reply to the original message
-                    await message.reply(chunk)
-                else:
-                    # Subsequent chunks as regular messages
-                    await message.channel.send(chunk)
-                    
+            # Stream the summary into the placeholder so the first words show
+            # up in well under a second instead of after the full completion
+            summary = await stream_summary_to_message(message.content, processing_msg)
+            if summary is None:
+                raise RuntimeError("Summarization stream failed")
+
+            # Final form: word-boundary chunks, overflow pipelined in groups
+            # of five to stay inside the channel rate bucket. Part numbers
+            # keep the text readable if a batch renders out of send order.
+            summary_chunks = _chunk(summary)
+            total = len(summary_chunks)
+            if total > 1:
+                summary_chunks = [f"({n}/{total}) {c}" for n, c in enumerate(summary_chunks, 1)]
+            await processing_msg.edit(
+                content=summary_chunks[0] if summary_chunks else "(empty summary)",
+                allowed_mentions=NO_MENTIONS,
+                suppress=True,
+            )
+            for i in range(1, len(summary_chunks), 5):
+                await asyncio.gather(*(
+                    message.channel.send(c, allowed_mentions=NO_MENTIONS, suppress=True)
+                    for c in summary_chunks[i:i + 5]
+                ))
+
         except Exception as e:
             await message.reply(f"Sorry, I couldn't summarize that message. Error: {str(e)}")
-        finally:
-            # Delete the processing message
             await processing_msg.delete()
 
 # Run bot
@@ -3,20 +3,48 @@ Eva API Service
 ------------
 REST API for summarization and extraction services.
 """
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
+from flask.json.provider import JSONProvider
+import orjson
 import os
+import re
+from functools import lru_cache
 from dotenv import load_dotenv
 
 from .services.summarization import get_summarization_service
 from .services.extraction import ExtractionService
 from .services.atomic_ideas import extract_atomic_ideas, get_atomic_idea_extractor
+from .services.llm_cache import InMemoryLLMCache, RedisLLMCache, set_llm_cache
 
 # Load environment variables
 load_dotenv()
 
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson
+
+    Serializing with orjson is several times faster than stdlib json, which
+    matters for extract_ideas responses carrying hundreds of idea dicts.
+    Existing jsonify/get_json calls pick it up transparently.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # Initialize the app
+Flask.json_provider_class = OrjsonProvider
 app = Flask(__name__)
 
+# Install a process-wide response cache so identical requests skip the API.
+# With REDIS_URL set the pool is shared across gunicorn workers and survives
+# restarts; otherwise fall back to a per-process bounded in-memory cache.
+if os.getenv('REDIS_URL'):
+    set_llm_cache(RedisLLMCache())
+else:
+    set_llm_cache(InMemoryLLMCache(maxsize=4096))
+
 # Initialize services
 summarization_service = get_summarization_service()
 atomic_idea_extractor = get_atomic_idea_extractor()
@@ -25,15 +53,22 @@ atomic_idea_extractor = get_atomic_idea_extractor()
 def summarize():
     """API endpoint for summarizing text
     
-    Expects a JSON payload with a 'text' field
+    Expects a JSON payload with a 'text' field, or a 'texts' list for bulk
+    summarization via the Message Batches API
     Returns a JSON response with 'title' and 'summary' fields
     """
     try:
         data = request.get_json()
-        
-        if not data or 'text' not in data:
+
+        if not data or ('text' not in data and 'texts' not in data):
             return jsonify({"error": "Missing 'text' field in request"}), 400
-            
+
+        # Bulk form: submit all texts as one asynchronous batch job
+        if 'texts' in data:
+            return jsonify({
+                "results": summarization_service.summarize_bulk(data['texts'])
+            })
+
         text = data['text']
         result = summarization_service.generate_summary(text)
         
@@ -44,42 +79,108 @@ def summarize():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/summarize_stream', methods=['POST'])
+def summarize_stream():
+    """API endpoint streaming a summary as chunked plain text
+
+    Expects a JSON payload with a 'text' field. The response body is the
+    summary text itself, flushed incrementally as the model produces it, so
+    clients can show progress long before the completion finishes.
+    """
+    try:
+        data = request.get_json()
+
+        if not data or 'text' not in data:
+            return jsonify({"error": "Missing 'text' field in request"}), 400
+
+        return Response(
+            stream_with_context(summarization_service.stream_summary(data['text'])),
+            mimetype='text/plain'
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/extract_ideas', methods=['POST'])
 def extract_ideas():
     """API endpoint for extracting atomic ideas from text
     
-    Expects a JSON payload with a 'text' field
+    Expects a JSON payload with a 'text' field, or a 'texts' list for bulk
+    extraction via the Message Batches API
     Returns a JSON response with extracted ideas and scores
     """
     try:
         data = request.get_json()
-        
-        if not data or 'text' not in data:
+
+        if not data or ('text' not in data and 'texts' not in data):
             return jsonify({"error": "Missing 'text' field in request"}), 400
-            
+
+        # Bulk form: submit all texts as one asynchronous batch job
+        if 'texts' in data:
+            results = get_atomic_idea_extractor().extract_batch(data['texts'])
+            return jsonify({
+                "results": [_parse_ideas(result) for result in results]
+            })
+
         text = data['text']
         result = extract_atomic_ideas(text)
-        
-        # Parse the results into a more structured format
-        ideas = []
-        if isinstance(result, str):
-            for item in result.split(':::'):
-                if '|' in item:
-                    text_part, score_part = item.rsplit('|', 2)
-                    score = int(score_part.strip('|'))
-                    ideas.append({"text": text_part.strip(), "score": score})
-                else:
-                    ideas.append({"text": item.strip(), "score": 0})
-        else:
-            # If already structured
-            ideas = result
-            
+
         return jsonify({
-            "ideas": ideas
+            "ideas": _parse_ideas(result)
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Matches a trailing "|score|" on one idea; the extractor joins items
+# with ":::", so the separator split happens first and colons inside the
+# idea text survive intact
+_SCORE_RE = re.compile(r"(.*?)\s*\|(\d+)\|\s*$")
+
+def _parse_ideas(result):
+    """Parse an extraction result into a structured list of ideas
+
+    Args:
+        result: Raw separator-joined string or already-parsed item list
+
+    Returns:
+        list: List of dicts with 'text' and 'score' keys
+    """
+    if not isinstance(result, str):
+        # If already structured
+        return result
+
+    ideas = []
+    for item in result.split(':::'):
+        match = _SCORE_RE.match(item.strip())
+        if match:
+            ideas.append({"text": match.group(1).strip(), "score": int(match.group(2))})
+    return ideas
+
+@lru_cache(maxsize=128)
+def _get_custom_extractor(prompt, separator, parse_score, temperature):
+    """Build (or reuse) an extraction service for these settings
+
+    Repeat custom extractions — the bot's related/define/fact-check
+    prompts are a handful of fixed strings — reuse the same instance and
+    its warm Anthropic client instead of rebuilding both per request.
+
+    Args:
+        prompt (str): Extraction prompt template
+        separator (str): Item separator
+        parse_score (bool): Whether to parse trailing scores
+        temperature (float): Sampling temperature
+
+    Returns:
+        ExtractionService: Configured service
+    """
+    return ExtractionService(
+        prompt=prompt,
+        separator=separator,
+        service_name="API Custom Extraction",
+        parse_score=parse_score,
+        temperature=temperature,
+        return_parsed_items=True
+    )
+
 @app.route('/api/custom_extraction', methods=['POST'])
 def custom_extraction():
     """API endpoint for custom extraction with user-defined prompt
@@ -98,17 +199,8 @@ def custom_extraction():
         separator = data.get('separator', ':::')
         parse_score = data.get('parse_score', False)
         temperature = data.get('temperature', 0.7)
-        
-        # Create a one-time extraction service
-        extractor = ExtractionService(
-            prompt=prompt,
-            separator=separator,
-            service_name="API Custom Extraction",
-            parse_score=parse_score,
-            temperature=temperature,
-            return_parsed_items=True
-        )
-        
+
+        extractor = _get_custom_extractor(prompt, separator, parse_score, temperature)
         result = extractor.extract(text)
         
         return jsonify({
@@ -141,14 +233,51 @@ def create_app(api_key=None):
 
 def run_app(host='0.0.0.0', port=5000, debug=False):
     """Run the Flask app
-    
+
+    Serves through gunicorn with gevent workers so requests blocked on a
+    Claude call don't serialize everything behind them; the single-threaded
+    Werkzeug dev server is only used for debug runs or when gunicorn isn't
+    installed.
+
     Args:
         host (str, optional): Host to run on. Defaults to '0.0.0.0'.
         port (int, optional): Port to run on. Defaults to 5000.
         debug (bool, optional): Whether to run in debug mode. Defaults to False.
     """
     port = int(os.environ.get('PORT', port))
-    app.run(host=host, port=port, debug=debug)
+
+    if debug:
+        app.run(host=host, port=port, debug=debug)
+        return
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("gunicorn not installed, falling back to the Flask dev server")
+        app.run(host=host, port=port, debug=debug)
+        return
+
+    class EvaApplication(BaseApplication):
+        """Embedded gunicorn application serving the module-level app"""
+
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    EvaApplication(app, {
+        'bind': f"{host}:{port}",
+        'worker_class': 'gevent',
+        'workers': int(os.environ.get('WEB_CONCURRENCY', 4)),
+        'worker_connections': 200,
+    }).run()
 
 if __name__ == '__main__':
     run_app(debug=False) 
\ No newline at end of file
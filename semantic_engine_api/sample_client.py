@@ -3,134 +3,158 @@ Sample Client for Eva API
 ---------------------
 A sample script demonstrating how to use the Eva API endpoints.
 """
-import requests
+import asyncio
 import json
 import sys
 
+import httpx
+import orjson
+
 # Base URL for the API
 API_BASE_URL = "http://localhost:5000/api"
 
-def call_summarize_api(text):
-    """Call the summarize API endpoint
-    
+# Shared async client with HTTP/2: every request multiplexes over one pooled
+# TCP/TLS connection, and orjson handles the request/response bodies
+_CLIENT = httpx.AsyncClient(
+    http2=True,
+    base_url=API_BASE_URL,
+    headers={"Content-Type": "application/json"},
+    timeout=120,
+)
+
+async def _post(path, payload):
+    """POST an orjson-encoded payload and decode the JSON response
+
     Args:
-        text (str): Text to summarize
-        
+        path (str): Endpoint path relative to API_BASE_URL
+        payload (dict): Request payload
+
     Returns:
-        dict: Response from API (title and summary)
+        dict: Decoded response, or None on error
     """
-    url = f"{API_BASE_URL}/summarize"
-    payload = {"text": text}
-    
-    response = requests.post(url, json=payload)
-    
+    response = await _CLIENT.post(path, content=orjson.dumps(payload))
+
     if response.status_code == 200:
-        return response.json()
+        return orjson.loads(response.content)
     else:
         print(f"Error: {response.status_code} - {response.text}")
         return None
 
-def call_extract_ideas_api(text):
+async def call_summarize_api(text):
+    """Call the summarize API endpoint
+
+    Args:
+        text (str): Text to summarize
+
+    Returns:
+        dict: Response from API (title and summary)
+    """
+    return await _post("/summarize", {"text": text})
+
+async def call_extract_ideas_api(text):
     """Call the extract ideas API endpoint
-    
+
     Args:
         text (str): Text to extract ideas from
-        
+
     Returns:
         dict: Response from API (ideas with scores)
     """
-    url = f"{API_BASE_URL}/extract_ideas"
-    payload = {"text": text}
-    
-    response = requests.post(url, json=payload)
-    
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Error: {response.status_code} - {response.text}")
-        return None
+    return await _post("/extract_ideas", {"text": text})
 
-def call_custom_extraction_api(text, prompt, parse_score=True):
+async def call_custom_extraction_api(text, prompt, parse_score=True):
     """Call the custom extraction API endpoint
-    
+
     Args:
         text (str): Text to process
         prompt (str): Extraction prompt
         parse_score (bool, optional): Whether to parse scores. Defaults to True.
-        
+
     Returns:
         dict: Response from API (extracted information)
     """
-    url = f"{API_BASE_URL}/custom_extraction"
     payload = {
         "text": text,
         "prompt": prompt,
         "parse_score": parse_score,
         "temperature": 0.7
     }
-    
-    response = requests.post(url, json=payload)
-    
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Error: {response.status_code} - {response.text}")
-        return None
+    return await _post("/custom_extraction", payload)
+
+async def call_summarize_batch(texts):
+    """Summarize many texts concurrently over the shared HTTP/2 connection
+
+    Args:
+        texts (list): Texts to summarize
+
+    Returns:
+        list: One response per text, in input order
+    """
+    return await asyncio.gather(*[call_summarize_api(t) for t in texts])
+
+async def call_extract_ideas_batch(texts):
+    """Extract ideas from many texts concurrently
+
+    Args:
+        texts (list): Texts to extract ideas from
+
+    Returns:
+        list: One response per text, in input order
+    """
+    return await asyncio.gather(*[call_extract_ideas_api(t) for t in texts])
 
-def call_health_api():
+async def call_health_api():
     """Call the health API endpoint
-    
+
     Returns:
         dict: Response from API (status)
     """
-    url = f"{API_BASE_URL}/health"
-    
-    response = requests.get(url)
-    
+    response = await _CLIENT.get("/health")
+
     if response.status_code == 200:
-        return response.json()
+        return orjson.loads(response.content)
     else:
         print(f"Error: {response.status_code} - {response.text}")
         return None
 
-def main():
+async def main():
     """Main function to demonstrate API usage"""
     # Check if API is running
-    health_result = call_health_api()
+    health_result = await call_health_api()
     if not health_result:
         print("Error: Could not connect to API. Make sure it's running.")
         sys.exit(1)
-    
+
     print("API is healthy:", health_result)
     print("\n" + "-" * 50 + "\n")
-    
+
     # Sample text for processing
     sample_text = """
-    SpaceX successfully launched its Falcon Heavy rocket on Tuesday, marking a significant milestone in private space exploration. 
-    The rocket, which is the most powerful operational rocket in the world, carried a Tesla Roadster as its payload. 
-    Elon Musk, the CEO of both SpaceX and Tesla, said this was just the beginning of their ambitious plans to make humanity a multi-planetary species. 
+    SpaceX successfully launched its Falcon Heavy rocket on Tuesday, marking a significant milestone in private space exploration.
+    The rocket, which is the most powerful operational rocket in the world, carried a Tesla Roadster as its payload.
+    Elon Musk, the CEO of both SpaceX and Tesla, said this was just the beginning of their ambitious plans to make humanity a multi-planetary species.
     The launch was watched by millions around the world and represents a major step forward in reducing the cost of access to space.
     Despite bad weather conditions earlier in the day, the launch proceeded smoothly with all three boosters performing as expected.
     """
-    
+
     # Example 1: Summarize
     print("EXAMPLE 1: SUMMARIZATION")
-    summary_result = call_summarize_api(sample_text)
+    summary_result = await call_summarize_api(sample_text)
     if summary_result:
         print(f"Title: {summary_result['title']}")
         print(f"Summary: {summary_result['summary']}")
-    
+
     print("\n" + "-" * 50 + "\n")
-    
+
     # Example 2: Extract Ideas
     print("EXAMPLE 2: ATOMIC IDEA EXTRACTION")
-    ideas_result = call_extract_ideas_api(sample_text)
+    ideas_result = await call_extract_ideas_api(sample_text)
     if ideas_result:
         for i, idea in enumerate(ideas_result['ideas']):
             print(f"{i+1}. {idea['text']} (Score: {idea['score']})")
-    
+
     print("\n" + "-" * 50 + "\n")
-    
+
     # Example 3: Custom Extraction
     print("EXAMPLE 3: CUSTOM EXTRACTION")
     prompt = """
@@ -138,11 +162,13 @@ def main():
     Rate each achievement on a scale of 1-5 based on its significance, where 5 is most significant.
     Format as: [Company Name]: [Achievement] |[score]|
     """
-    
-    custom_result = call_custom_extraction_api(sample_text, prompt)
+
+    custom_result = await call_custom_extraction_api(sample_text, prompt)
     if custom_result:
         print("Custom Extraction Result:")
         print(json.dumps(custom_result, indent=2))
 
+    await _CLIENT.aclose()
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main())
@@ -4,6 +4,7 @@ Atomic Idea Extractor
 Service for extracting key atomic ideas from text.
 """
 from .extraction import ExtractionService
+from .semantic_cache import SemanticCache
 
 # Create the atomic idea extractor instance
 def create_atomic_idea_extractor(api_key=None):
@@ -46,13 +47,27 @@ def get_atomic_idea_extractor(api_key=None):
         _instance = create_atomic_idea_extractor(api_key=api_key)
     return _instance
 
+# Semantic cache: reposts and lightly edited resubmissions aren't
+# byte-identical, so the exact-match LLM cache misses them; similar-enough
+# inputs reuse the previous extraction instead of a new Claude call
+_semantic_cache = SemanticCache(threshold=0.95)
+
 def extract_atomic_ideas(text: str) -> str:
     """Extract atomic ideas from text.
 
+    Near-duplicate inputs are served from the semantic cache instead of
+    re-running the extraction.
+
     Args:
         text (str): Text to extract atomic ideas from
 
     Returns:
         str: Extracted atomic ideas with scores
     """
-    return get_atomic_idea_extractor().extract(text) 
\ No newline at end of file
+    cached = _semantic_cache.lookup(text)
+    if cached is not None:
+        return cached
+
+    result = get_atomic_idea_extractor().extract(text)
+    _semantic_cache.update(text, result)
+    return result 
\ No newline at end of file
@@ -21,29 +21,11 @@ def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVE
     Returns:
         List[str]: List of text chunks
     """
-    print('Starting text chunking...', {'textLength': len(text), 'chunkSize': chunk_size, 'overlap': overlap})
-    chunks = []
-    start_index = 0
-    
-    while start_index < len(text):
-        end_index = min(start_index + chunk_size, len(text))
-        chunk = text[start_index:end_index]
-        chunks.append(chunk)
-        print(f'Created chunk {len(chunks)}:', {
-            'startIndex': start_index,
-            'endIndex': end_index,
-            'chunkLength': len(chunk)
-        })
-        
-        # If we've reached the end of the text, break
-        if end_index == len(text):
-            break
-        
-        # Move start index forward, but ensure we make progress
-        start_index = min(end_index - overlap, len(text) - 1)
-        # If we're too close to the end to make another meaningful chunk, just break
-        if len(text) - start_index < chunk_size / 2:
-            break
-    
-    print('Chunking complete:', {'totalChunks': len(chunks)})
-    return chunks 
\ No newline at end of file
+    # Branch-free arithmetic slicing: each chunk starts one stride after the
+    # previous, and starts within half a chunk of the end are dropped (the
+    # old loop's tail cutoff). Slicing stays in C; no per-chunk logging.
+    step = chunk_size - overlap
+    return [
+        text[start:start + chunk_size]
+        for start in range(0, max(len(text) - chunk_size // 2, 1), step)
+    ]
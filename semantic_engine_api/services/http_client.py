@@ -0,0 +1,28 @@
+"""
+HTTP Client
+---------
+Shared HTTP/2 transport for Anthropic API calls.
+"""
+import httpx
+
+# One client for every service: HTTP/2 multiplexes concurrent Claude calls
+# (parallel chunk summaries, simultaneous extraction requests) over a single
+# TCP/TLS connection instead of queueing behind HTTP/1.1 per-host limits,
+# and the keepalive pool skips the TLS handshake on repeat calls.
+_client = None
+
+
+def get_http_client() -> httpx.Client:
+    """Return the shared HTTP/2 client, creating it on first use.
+
+    Returns:
+        httpx.Client: The shared client
+    """
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=120,
+        )
+    return _client
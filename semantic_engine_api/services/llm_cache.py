@@ -0,0 +1,254 @@
+"""
+LLM Response Cache
+----------------
+Process-wide cache for Claude responses so identical requests skip the API.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from anthropic import RateLimitError
+
+
+class InMemoryLLMCache:
+    """Bounded in-memory cache mapping request parameters to response text.
+
+    Entries are keyed by a hash of the full request (model, prompt, sampling
+    parameters), so only byte-identical requests hit. Least-recently-used
+    entries are evicted once maxsize is reached to bound memory growth.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        """Initialize the cache.
+
+        Args:
+            maxsize (int, optional): Maximum number of cached responses. Defaults to 4096.
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Look up a cached response.
+
+        Args:
+            key (str): Cache key from make_key
+
+        Returns:
+            Optional[str]: Cached response text, or None on a miss
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            return None
+
+    def update(self, key: str, value: str) -> None:
+        """Store a response, evicting the least-recently-used entry if full.
+
+        Args:
+            key (str): Cache key from make_key
+            value (str): Response text to cache
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class RedisLLMCache:
+    """Redis-backed cache shared across workers and hosts.
+
+    Each gunicorn worker keeps its own InMemoryLLMCache, so a hit in one
+    worker is still a miss in every other, and a restart wipes the pool.
+    Backing the cache with Redis gives all workers one shared response pool
+    that survives deploys. Keys come from make_key (sha256, stable across
+    processes) so workers agree on them.
+    """
+
+    KEY_PREFIX = 'llm_cache:'
+
+    def __init__(self, url: Optional[str] = None, ttl: int = 7 * 24 * 3600):
+        """Initialize the cache.
+
+        Args:
+            url (Optional[str], optional): Redis connection URL. Defaults to
+                the REDIS_URL environment variable or localhost.
+            ttl (int, optional): Seconds before entries expire. Defaults to 7 days.
+        """
+        import redis
+        self.ttl = ttl
+        self.client = redis.Redis.from_url(
+            url or os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+        )
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Look up a cached response.
+
+        Args:
+            key (str): Cache key from make_key
+
+        Returns:
+            Optional[str]: Cached response text, or None on a miss
+        """
+        value = self.client.get(self.KEY_PREFIX + key)
+        if value is None:
+            return None
+        return value.decode('utf-8')
+
+    def update(self, key: str, value: str) -> None:
+        """Store a response with the configured expiry.
+
+        Args:
+            key (str): Cache key from make_key
+            value (str): Response text to cache
+        """
+        self.client.setex(self.KEY_PREFIX + key, self.ttl, value.encode('utf-8'))
+
+
+def make_key(**params) -> str:
+    """Build a stable cache key from request parameters.
+
+    Uses sha256 over the JSON-serialized parameters (sorted keys) so the same
+    request always maps to the same key, including across processes.
+
+    Args:
+        **params: The keyword arguments passed to messages.create
+
+    Returns:
+        str: Hex digest identifying the request
+    """
+    serialized = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+# Global cache instance, None until installed via set_llm_cache
+_llm_cache = None
+
+
+def set_llm_cache(cache) -> None:
+    """Install a process-wide LLM cache.
+
+    Args:
+        cache: Cache instance implementing lookup(key) and update(key, value)
+    """
+    global _llm_cache
+    _llm_cache = cache
+
+
+def get_llm_cache():
+    """Get the installed LLM cache, or None if caching is disabled.
+
+    Returns:
+        The installed cache instance or None
+    """
+    return _llm_cache
+
+
+# Retry/limit knobs: bursty parallel chunk dispatch can trip the API's
+# rate limit, and without backoff one 429 fails the whole summary and
+# throws away every in-flight chunk
+_MAX_ATTEMPTS = 6
+_BACKOFF_INITIAL = 1.0
+_BACKOFF_MAX = 30.0
+
+_concurrency = threading.BoundedSemaphore(
+    int(os.getenv('ANTHROPIC_MAX_CONCURRENCY', '8'))
+)
+
+
+class _TokenBucket:
+    """Token bucket smoothing request dispatch to a fixed per-minute rate."""
+
+    def __init__(self, rate_per_minute: int):
+        """Initialize the bucket.
+
+        Args:
+            rate_per_minute (int): Sustained requests per minute to allow
+        """
+        self.capacity = rate_per_minute
+        self.rate = rate_per_minute / 60.0
+        self.tokens = float(rate_per_minute)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_rpm = int(os.getenv('ANTHROPIC_RPM', '0'))
+_rate_limiter = _TokenBucket(_rpm) if _rpm > 0 else None
+
+
+def _create_message(client, **params) -> str:
+    """Call messages.create with concurrency/rate shaping and 429 backoff.
+
+    Dispatch is bounded by ANTHROPIC_MAX_CONCURRENCY simultaneous calls and,
+    when ANTHROPIC_RPM is set, paced to that sustained rate. Rate-limit
+    errors are retried with jittered exponential backoff instead of
+    propagating on the first 429.
+
+    Args:
+        client: Anthropic client to use
+        **params: Keyword arguments for client.messages.create
+
+    Returns:
+        str: The response text
+    """
+    for attempt in range(_MAX_ATTEMPTS):
+        if _rate_limiter is not None:
+            _rate_limiter.acquire()
+        try:
+            with _concurrency:
+                response = client.messages.create(**params)
+            return response.content[0].text
+        except RateLimitError:
+            if attempt == _MAX_ATTEMPTS - 1:
+                raise
+            delay = min(_BACKOFF_MAX, _BACKOFF_INITIAL * 2 ** attempt)
+            time.sleep(delay * (0.5 + random.random() / 2))
+
+
+def cached_completion(client, **params) -> str:
+    """Create a message via the Anthropic client, consulting the global cache.
+
+    On a cache hit the stored response text is returned without any network
+    call; on a miss the API is called and the response text is cached.
+
+    Args:
+        client: Anthropic client to use on a cache miss
+        **params: Keyword arguments for client.messages.create
+
+    Returns:
+        str: The response text
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return _create_message(client, **params)
+
+    key = make_key(**params)
+    cached = cache.lookup(key)
+    if cached is not None:
+        return cached
+
+    result = _create_message(client, **params)
+    cache.update(key, result)
+    return result
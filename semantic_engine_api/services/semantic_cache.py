@@ -0,0 +1,97 @@
+"""
+Semantic Cache
+------------
+Embedding-similarity cache for near-duplicate inputs that miss exact-match caching.
+"""
+import threading
+from typing import Any, Optional
+
+import numpy as np
+
+# Small sentence-transformers model: 384-dim, a few ms per embed on CPU,
+# versus seconds for a Claude call
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+
+
+class SemanticCache:
+    """Cache that returns a stored result when a new input is similar enough.
+
+    Inputs are embedded with a small sentence-transformers model and compared
+    by cosine similarity against previously cached entries, so reposts and
+    lightly edited near-duplicates hit even though their bytes differ. With at
+    most a few thousand entries a linear scan over one normalized matrix is
+    fast enough that an ANN index would be overkill.
+    """
+
+    def __init__(self, threshold: float = 0.95, maxsize: int = 1024):
+        """Initialize the cache.
+
+        Args:
+            threshold (float, optional): Minimum cosine similarity for a hit. Defaults to 0.95.
+            maxsize (int, optional): Maximum entries before oldest are evicted. Defaults to 1024.
+        """
+        self.threshold = threshold
+        self.maxsize = maxsize
+        # Fixed-size ring buffer: the (maxsize, dim) matrix is allocated once
+        # and rows are overwritten in place, so inserts and evictions are O(1)
+        # instead of a vstack copy plus list.pop(0) shift per update
+        self._vectors = None  # preallocated matrix of normalized embeddings
+        self._values = []
+        self._count = 0  # how many rows are filled
+        self._next = 0   # next row to (over)write
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Embed text as a normalized vector, loading the model on first use.
+
+        Args:
+            text (str): Text to embed
+
+        Returns:
+            np.ndarray: Normalized embedding vector
+        """
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(EMBEDDING_MODEL)
+        vector = self._model.encode(text)
+        return vector / np.linalg.norm(vector)
+
+    def lookup(self, text: str) -> Optional[Any]:
+        """Return the cached value for the most similar entry, if close enough.
+
+        Args:
+            text (str): Input text
+
+        Returns:
+            Optional[Any]: Cached value, or None if nothing is similar enough
+        """
+        vector = self._embed(text)
+        with self._lock:
+            if self._count == 0:
+                return None
+            similarities = self._vectors[:self._count] @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                return self._values[best]
+            return None
+
+    def update(self, text: str, value: Any) -> None:
+        """Store a value under the embedding of its input text.
+
+        Args:
+            text (str): Input text
+            value (Any): Result to cache
+        """
+        vector = self._embed(text)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.empty((self.maxsize, vector.shape[0]), dtype=vector.dtype)
+                self._values = [None] * self.maxsize
+            # Once full, the write cursor wraps and the oldest entry is
+            # overwritten in place
+            self._vectors[self._next] = vector
+            self._values[self._next] = value
+            self._next = (self._next + 1) % self.maxsize
+            if self._count < self.maxsize:
+                self._count += 1
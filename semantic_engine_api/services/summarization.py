@@ -3,14 +3,35 @@ Summarization Service
 -------------------
 Service for generating summaries and titles from text.
 """
+import json
+import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, List
 from anthropic import Anthropic
 from dotenv import load_dotenv
 from .chunking import chunk_text
+from .http_client import get_http_client
+from .llm_cache import cached_completion
+from .semantic_cache import SemanticCache
 
 load_dotenv()
 
+# Lazy %s formatting keeps argument rendering off the hot path when the
+# level is disabled; print would also serialize the parallel chunk workers
+# on stdout's lock
+logger = logging.getLogger(__name__)
+
+# Semantic cache: re-summarize requests for near-identical windows (a
+# conversation with one trailing message edited, a repost) miss the
+# exact-match LLM cache but reuse the previous summary here. The hit
+# threshold is tunable without a deploy; raise it if near-miss inputs
+# start sharing summaries they shouldn't
+_semantic_cache = SemanticCache(
+    threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.95'))
+)
+
 class SummarizationService:
     # Constants for title generation
     TITLE_MAX_TOKENS = 80
@@ -18,108 +39,265 @@ class SummarizationService:
     SUMMARY_TEMPERATURE = 0.4
     SUMMARY_MAX_TOKENS = 1000
     MERGE_MAX_TOKENS = 2000
+    # Cap on concurrent per-chunk Claude calls: enough to overlap the
+    # network/inference latency, low enough to stay clear of rate limits
+    MAX_PARALLEL_CHUNKS = 4
+
+    # Static prompt text, built once; call sites only append the input
+    TITLE_PROMPT = "Generate a short, descriptive title (max 50 characters) that captures the main topic or theme of the text. The title should be concise but informative. Text:"
+    SUMMARY_PROMPT = "Create a short summary that captures the key points and main ideas of the following conversation between users, clearly listing each user's contribution: "
+    MERGE_PROMPT = (
+        "You are a skilled editor merging multiple summaries of longer conversation "
+        "into a single coherent document. Maintain the key points while ensuring "
+        "smooth transitions and avoiding redundancy. Below are summaries of "
+        "different parts of a longer document. Merge them into a single coherent "
+        "summary, and also produce a short descriptive title (max 50 characters). "
+        "Respond with strict JSON of the form {\"title\": \"...\", \"summary\": \"...\"} "
+        "and nothing else:\n\n"
+    )
+    COMBINED_PROMPT = (
+        "Create a short summary that captures the key points and main ideas of "
+        "the following conversation between users, clearly listing each user's "
+        "contribution. Also produce a short descriptive title (max 50 "
+        "characters). Respond with strict JSON of the form "
+        "{\"title\": \"...\", \"summary\": \"...\"} and nothing else:\n\n"
+    )
 
     def __init__(self, api_key=None):
-        self.client = Anthropic(api_key=api_key or os.getenv('ANTHROPIC_API_KEY'))
+        self.client = Anthropic(
+            api_key=api_key or os.getenv('ANTHROPIC_API_KEY'),
+            http_client=get_http_client(),
+        )
 
     def generate_title(self, text: str) -> str:
         try:
-            response = self.client.messages.create(
+            title = cached_completion(
+                self.client,
                 model="claude-3-sonnet-20240229",
                 max_tokens=self.TITLE_MAX_TOKENS,
                 temperature=self.TITLE_TEMPERATURE,
                 messages=[{
                     "role": "user",
-                    "content": "Generate a short, descriptive title (max 50 characters) that captures the main topic or theme of the text. The title should be concise but informative. Text:" + text
+                    "content": self.TITLE_PROMPT + text
                 }]
             )
 
-            title = response.content[0].text.strip()
-            return title
+            return title.strip()
         except Exception as error:
-            print('Error generating title:', error)
+            logger.error("Error generating title: %s", error)
             raise
 
     def generate_summary(self, text: str) -> Dict[str, str]:
-        print('\n=== Starting Summary Generation ===')
-        print('Input text length:', len(text))
-        
+        logger.debug("Starting summary generation: input length %d", len(text))
+
+        cached = _semantic_cache.lookup(text)
+        if cached is not None:
+            return cached
+
         try:
             # Get chunks using the shared chunking service
             chunks = chunk_text(text)
-            print(f"Processing {len(chunks)} chunks for summary")
-
-            # Process chunks sequentially to manage memory
-            chunk_summaries = []
-            for i, chunk in enumerate(chunks):
-                print(f"\n--- Processing Chunk {i + 1}/{len(chunks)} for Summary ---")
-                summary = self._generate_summary_for_chunk(chunk, i)
-                chunk_summaries.append(summary)
-                chunks[i] = None  # Clear processed chunk from memory
-                
-            # If we only have one chunk, use its summary directly
-            if len(chunk_summaries) == 1:
-                final_summary = chunk_summaries[0]
+            logger.debug("Processing %d chunks for summary", len(chunks))
+
+            # Summarize chunks concurrently: each call is a multi-second
+            # network round-trip, so a bounded thread fan-out makes the
+            # stage cost roughly the slowest chunk instead of the sum
+            if len(chunks) == 1:
+                # Short texts (the common case) get exactly one call that
+                # returns both fields, instead of separate summary and
+                # title round-trips
+                result = self._generate_title_and_summary_single(chunks[0])
             else:
-                # Merge the summaries if we have multiple chunks
-                print('\nMerging summaries...')
-                final_summary = self._merge_summaries(chunk_summaries)
+                with ThreadPoolExecutor(
+                    max_workers=min(self.MAX_PARALLEL_CHUNKS, len(chunks))
+                ) as pool:
+                    chunk_summaries = list(pool.map(
+                        self._generate_summary_for_chunk, chunks, range(len(chunks))
+                    ))
+
+                # The merge call emits the title alongside the merged summary,
+                # saving a separate title round-trip
+                logger.debug("Merging summaries...")
+                result = self._merge_summaries(chunk_summaries)
+
+            _semantic_cache.update(text, result)
+            return result
+        except Exception as error:
+            logger.error("Error in generate_summary: %s", error)
+            raise
+
+    def stream_summary(self, text: str):
+        """Yield summary text incrementally as the model produces it.
+
+        Single-chunk texts stream token deltas straight from the API, so the
+        first words arrive in hundreds of milliseconds instead of after the
+        full completion. Longer texts still need the chunk-and-merge
+        pipeline and yield the merged summary once it's ready.
+
+        Args:
+            text (str): Text to summarize
+
+        Yields:
+            str: Summary text fragments, in order
+        """
+        chunks = chunk_text(text)
+        if len(chunks) > 1:
+            yield self.generate_summary(text)['summary']
+            return
+
+        with self.client.messages.stream(
+            model="claude-3-sonnet-20240229",
+            max_tokens=self.SUMMARY_MAX_TOKENS,
+            temperature=self.SUMMARY_TEMPERATURE,
+            messages=[{
+                "role": "user",
+                "content": self.SUMMARY_PROMPT + chunks[0]
+            }]
+        ) as stream:
+            for delta in stream.text_stream:
+                yield delta
+
+    def summarize_bulk(self, texts: List[str], poll_interval: float = 5.0) -> List[Dict[str, str]]:
+        """Summarize many texts via the Message Batches API.
+
+        Submits all texts as one asynchronous batch job instead of N
+        synchronous calls, then polls until the batch has finished. Batches
+        are processed at reduced token cost, so this is the preferred path
+        for backfills and other bulk workloads where latency doesn't matter.
+        Each text goes up as a single combined title+summary request.
+
+        Args:
+            texts (List[str]): Texts to summarize
+            poll_interval (float, optional): Seconds between status polls. Defaults to 5.0.
+
+        Returns:
+            List[Dict[str, str]]: One {'title', 'summary'} dict per input
+                text, in input order
+        """
+        logger.info("Submitting batch of %d texts for summarization", len(texts))
 
-            # Generate title from the final summary
-            print('\nGenerating title...')
-            title = self.generate_title(final_summary)
-            print('Title generated:', title)
+        batch = self.client.messages.batches.create(
+            requests=[{
+                "custom_id": str(i),
+                "params": {
+                    "model": "claude-3-sonnet-20240229",
+                    "max_tokens": self.SUMMARY_MAX_TOKENS,
+                    "temperature": self.SUMMARY_TEMPERATURE,
+                    "messages": [{
+                        "role": "user",
+                        "content": self.COMBINED_PROMPT + text
+                    }]
+                }
+            } for i, text in enumerate(texts)]
+        )
 
-            return {'title': title, 'summary': final_summary}
+        while True:
+            batch = self.client.messages.batches.retrieve(batch.id)
+            if batch.processing_status == 'ended':
+                break
+            logger.debug("Waiting for batch %s: %s", batch.id, batch.processing_status)
+            time.sleep(poll_interval)
+
+        # Results stream in completion order; map back via custom_id
+        results_by_id = {}
+        for entry in self.client.messages.batches.results(batch.id):
+            if entry.result.type != 'succeeded':
+                logger.error("Batch entry %s failed: %s", entry.custom_id, entry.result.type)
+                raise RuntimeError(f"Batch entry {entry.custom_id} failed: {entry.result.type}")
+            results_by_id[entry.custom_id] = entry.result.message.content[0].text
+
+        logger.info("Batch summarization complete: %s", batch.id)
+        return [self._parse_combined(results_by_id[str(i)]) for i in range(len(texts))]
+
+    def _parse_combined(self, response: str) -> Dict[str, str]:
+        """Parse a combined title+summary response.
+
+        Falls back to a separate title round-trip only if the model ignored
+        the JSON instruction.
+
+        Args:
+            response (str): Raw model output
+
+        Returns:
+            Dict[str, str]: Dict with 'title' and 'summary' keys
+        """
+        try:
+            parsed = json.loads(response)
+            if isinstance(parsed, dict) and 'title' in parsed and 'summary' in parsed:
+                return {'title': parsed['title'], 'summary': parsed['summary']}
+        except json.JSONDecodeError:
+            pass
+        return {'title': self.generate_title(response), 'summary': response}
+
+    def _generate_title_and_summary_single(self, text: str) -> Dict[str, str]:
+        try:
+            response = cached_completion(
+                self.client,
+                model="claude-3-sonnet-20240229",
+                max_tokens=self.SUMMARY_MAX_TOKENS,
+                temperature=self.SUMMARY_TEMPERATURE,
+                messages=[{
+                    "role": "user",
+                    "content": self.COMBINED_PROMPT + text
+                }]
+            )
+            return self._parse_combined(response)
         except Exception as error:
-            print('\nError in generate_summary:', error)
+            logger.error("Error generating single-call summary: %s", error)
             raise
 
     def _generate_summary_for_chunk(self, chunk: str, index: int) -> str:
         try:
-            print(f"Processing chunk {index + 1}:", {'chunkLength': len(chunk)})
+            logger.debug("Processing chunk %d: length %d", index + 1, len(chunk))
             
-            response = self.client.messages.create(
+            summary = cached_completion(
+                self.client,
                 model="claude-3-sonnet-20240229",
                 max_tokens=self.SUMMARY_MAX_TOKENS,
                 temperature=self.SUMMARY_TEMPERATURE,
                 messages=[{
                     "role": "user",
-                    "content": "Create a short summary that captures the key points and main ideas of the following conversation between users, clearly listing each user's contribution: " + chunk
+                    "content": self.SUMMARY_PROMPT + chunk
                 }]
             )
-
-            summary = response.content[0].text
-            print(f"Completed chunk {index + 1} summary:", {'summaryLength': len(summary)})
+            logger.debug("Completed chunk %d summary: length %d", index + 1, len(summary))
             
             return summary
         except Exception as error:
-            print(f"Error generating summary for chunk {index + 1}:", error)
+            logger.error("Error generating summary for chunk %d: %s", index + 1, error)
             raise
 
-    def _merge_summaries(self, summaries: List[str]) -> str:
+    def _merge_summaries(self, summaries: List[str]) -> Dict[str, str]:
         try:
-            print('Starting summary merge...', {'numberOfSummaries': len(summaries)})
-            
+            logger.debug("Starting summary merge of %d summaries", len(summaries))
+
             summaries_text = '\n\n'.join(
                 f"Part {i + 1}:\n{s}" for i, s in enumerate(summaries)
             )
 
-            response = self.client.messages.create(
+            merged = cached_completion(
+                self.client,
                 model="claude-3-sonnet-20240229",
                 max_tokens=self.MERGE_MAX_TOKENS,
                 temperature=self.SUMMARY_TEMPERATURE,
                 messages=[{
                     "role": "user",
-                    "content": f"You are a skilled editor merging multiple summaries of longer conversation into a single coherent document. Maintain the key points while ensuring smooth transitions and avoiding redundancy. Below are summaries of different parts of a longer document. Please merge them into a single coherent summary:\n\n{summaries_text}"
+                    "content": self.MERGE_PROMPT + summaries_text
                 }]
             )
+            logger.debug("Merge complete: response length %d", len(merged))
 
-            merged_summary = response.content[0].text
-            print('Merge complete:', {'mergedSummaryLength': len(merged_summary)})
-            return merged_summary
+            # One call produces both fields; fall back to a separate title
+            # round-trip only if the model ignored the JSON instruction
+            try:
+                parsed = json.loads(merged)
+                if isinstance(parsed, dict) and 'title' in parsed and 'summary' in parsed:
+                    return {'title': parsed['title'], 'summary': parsed['summary']}
+            except json.JSONDecodeError:
+                pass
+            return {'title': self.generate_title(merged), 'summary': merged}
         except Exception as error:
-            print('Error merging summaries:', error)
+            logger.error("Error merging summaries: %s", error)
             raise
 
 # Create a singleton instance